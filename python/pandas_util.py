@@ -32,17 +32,35 @@ are created and given the same .groupby.agg process.
 NamedTotal:\n
 \tDataclass that defines necessary fields for filtering and renaming sub/grand totals
 define_aggregator_from_dict:\n
-\tDefines a function that reduces a DataFrame into a Series of measures.
+\tDefines a function (or named aggregations) that reduces a DataFrame into measures.
 dataframe_combination_agg:\n
 \tCombine results of the same groupby - agg process on subsets of a df
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
 from enum import Enum
-from itertools import combinations
-from typing import List, Optional, Union, Callable, Any, Tuple
-
-from pandas import concat, DataFrame, Series
+from itertools import chain, combinations, product
+from types import SimpleNamespace
+from typing import List, Optional, Union, Callable, Any, Tuple, Dict, TextIO
+
+from numpy import fromiter, int8, ndarray, ones, zeros
+from pandas import (
+    concat,
+    factorize,
+    read_csv,
+    Categorical,
+    DataFrame,
+    Index,
+    MultiIndex,
+    NamedAgg,
+    RangeIndex,
+    Series,
+)
+from pandas.api.types import CategoricalDtype, is_string_dtype
+from pandas.errors import ParserError
 
 
 class PandasDtype(str, Enum):
@@ -63,11 +81,17 @@ class PandasDtype(str, Enum):
     UINT8 = "UInt8"
 
 
+_PANDAS_DTYPE_VALUES = frozenset(e.value for e in PandasDtype)
+_PANDAS_DTYPE_URL = (
+    "https://pandas.pydata.org/pandas-docs/stable/user_guide/basics.html#dtypes"
+)
+
+
 # *************************************************************************************
 # region ColumnEnumerator
 
 
-@dataclass
+@dataclass(slots=True)
 class ColumnSpecs:
     """Dataclass representation of a DataFrame columns
 
@@ -85,23 +109,15 @@ class ColumnSpecs:
     desc: Optional[str] = None
 
     def __post_init__(self):
-        available_types = [e.value for e in PandasDtype]
-        dtype_url = (
-            "https://pandas.pydata.org/pandas-docs/stable/user_guide/basics.html#dtypes"
-        )
         if isinstance(self.dtype, PandasDtype):
             self.dtype = self.dtype.value
-        if self.dtype not in available_types:
+        if self.dtype not in _PANDAS_DTYPE_VALUES:
             raise ValueError(
                 f"'{self.dtype}' is not a pandas dtype string representation."
-                f"See {dtype_url} for more details"
+                f"See {_PANDAS_DTYPE_URL} for more details"
             )
 
 
-class _GroupObject:
-    """Do-nothing class that acts only as a holder for attributes"""
-
-
 class _ColumnEnumerator:
     """Base class that does not add column lookup attributes.
 
@@ -109,6 +125,8 @@ class _ColumnEnumerator:
     in a ColumnEnumerator instance.
     """
 
+    __slots__ = ("_specs", "_name_to_specs", "_select", "_dtype_mapping")
+
     def __init__(self, columns: List[ColumnSpecs]):
         """
 
@@ -117,6 +135,9 @@ class _ColumnEnumerator:
         columns: list of all ColumnSpecs instances to add to the enumerator
         """
         self._specs = columns
+        self._name_to_specs = {c.name: c for c in columns}
+        self._select = [c.name for c in columns]
+        self._dtype_mapping = {c.name: c.dtype for c in columns}
 
     @property
     def specs(self) -> List[ColumnSpecs]:
@@ -126,12 +147,12 @@ class _ColumnEnumerator:
     @property
     def select(self) -> List[str]:
         """List of column names in the order given during init"""
-        return [c.name for c in self._specs]
+        return list(self._select)
 
     @property
     def dtype_mapping(self) -> dict:
         """Dict of name:dtype pairs for all columns"""
-        return {c.name: c.dtype for c in self._specs}
+        return dict(self._dtype_mapping)
 
     def __repr__(self) -> str:
         specs = ",\n  ".join([repr(c) for c in self._specs])
@@ -168,10 +189,10 @@ class ColumnEnumerator(_ColumnEnumerator):
         columns: list of ColumnSpecs instances, or list of column names.
         """
         if self._groups is None:
-            self._groups = _GroupObject
+            self._groups = SimpleNamespace()
 
         columns = list(map(self._get_specs_instance, columns))
-        self._groups.__setattr__(attr, _ColumnEnumerator(columns))
+        setattr(self._groups, attr, _ColumnEnumerator(columns))
 
     def _get_specs_instance(self, value: Union[ColumnSpecs, str]) -> ColumnSpecs:
         """Return ColumnSpecs instance represented by the column name
@@ -179,14 +200,14 @@ class ColumnEnumerator(_ColumnEnumerator):
         Column must exist within this instances specs attribute
         """
         if isinstance(value, str):
-            value = [c for c in self._specs if c.name == value][0]
+            value = self._name_to_specs.get(value, value)
 
         if isinstance(value, ColumnSpecs):
-            if value in self._specs:
+            if self._name_to_specs.get(value.name) == value:
                 return value
 
         raise ValueError(
-            f"'{value}' is not a name or ColumnSpecs instance within this"
+            f"'{value}' is not a name or ColumnSpecs instance within this "
             "ColumnEnumerator"
         )
 
@@ -199,11 +220,29 @@ class ColumnEnumerator(_ColumnEnumerator):
         filepath: str filepath to a .csv file
         ignore_header: indicate if the file has a header row to ignore
         """
-        with open(filepath, "r") as csv:
-            rows = [row.strip().split(",") for row in csv.readlines()]
-        if ignore_header:
-            rows = rows[1:]
-        cols = list(map(lambda row: ColumnSpecs(*row), rows))
+        fields = ["attr", "name", "dtype", "desc"]
+        field_count_error = ValueError(
+            f"'{filepath}' has rows with more than {len(fields)} fields. Expected "
+            f"{','.join(fields)} per row"
+        )
+        try:
+            frame = read_csv(
+                filepath,
+                header=0 if ignore_header else None,
+                names=fields,
+                dtype=str,
+                keep_default_na=False,
+            )
+        except ParserError as err:
+            raise field_count_error from err
+        # read_csv moves leading fields into the index when rows have too many fields
+        if not isinstance(frame.index, RangeIndex):
+            raise field_count_error
+
+        cols = [
+            ColumnSpecs(attr, name, dtype, desc or None)
+            for attr, name, dtype, desc in frame.itertuples(index=False, name=None)
+        ]
         return cls(cols)
 
 
@@ -214,7 +253,7 @@ class ColumnEnumerator(_ColumnEnumerator):
 # region COMBINATION AGGREGATOR
 
 
-@dataclass
+@dataclass(slots=True)
 class NamedTotal:
     """Defines necessary fields for filtering and renaming sub/grand totals"""
 
@@ -224,15 +263,36 @@ class NamedTotal:
 
 
 SubsetType = Tuple[NamedTotal]
+MaskKeyType = Tuple[str, Callable[[Any], bool]]
+AggregatorType = Union[Callable[[DataFrame], Series], Dict[str, NamedAgg]]
 
+# max ratio of distinct values to rows for a groupby column to be encoded as categorical
+_MAX_CATEGORY_RATIO = 0.5
 
-def define_aggregator_from_dict(measures: dict):
+# write buffer of the csv file that aggregations are streamed into
+_CSV_BUFFER_SIZE = 1 << 20
+
+# aggfunc that re-aggregates already aggregated values of each decomposable aggfunc
+_ROLLUP_AGGFUNCS = {
+    "sum": "sum",
+    "count": "sum",
+    "size": "sum",
+    "min": "min",
+    "max": "max",
+}
+
+
+def define_aggregator_from_dict(measures: dict) -> AggregatorType:
     """Defines a function that reduces a DataFrame into a Series.
 
     The aggregator function uses a mapping of {str: Any} where str becomes the
     column name and Any is the aggregated value. Users must ensure their mapping
     reduces the input DataFrame as intended.
 
+    When every value is a (column, aggfunc) tuple or NamedAgg, the mapping is returned
+    as named aggregations instead, so pandas can reduce each column without a Python
+    call per group.
+
     Args
     ----
     measures: Mapping of column name to any value. Values are typically a single scalar
@@ -240,14 +300,21 @@ def define_aggregator_from_dict(measures: dict):
 
     Returns
     -------
-    Callable[[DataFrame], Series]
+    Callable[[DataFrame], Series], or Dict[str, NamedAgg] for named aggregations
     """
+    # NamedAgg is a tuple subclass before pandas 3.0 but its own class since then
+    specs = measures.values()
+    if measures and all(isinstance(spec, (tuple, NamedAgg)) for spec in specs):
+        return {
+            alias: spec if isinstance(spec, NamedAgg) else NamedAgg(*spec)
+            for alias, spec in measures.items()
+        }
+
+    index = Index(measures.keys())
+    funcs = tuple(measures.values())
 
     def aggregator(grp: DataFrame) -> Series:
-        d = {}
-        for alias, func in measures.items():
-            d[alias] = func(grp)
-        return Series(d, index=d.keys())
+        return Series([func(grp) for func in funcs], index=index)
 
     return aggregator
 
@@ -257,6 +324,10 @@ def _generate_valid_subsets(
 ) -> SubsetType:
     """Yield a tuple of all NamedTotals that comprise a valid combination.
 
+    A valid combination holds at most one NamedTotal per column, so combinations are
+    built from the distinct columns and expanded with each of their NamedTotals rather
+    than filtering every combination of totals.
+
     Args
     ----
     totals: list of NamedTotal instances that define the subsets.
@@ -267,56 +338,171 @@ def _generate_valid_subsets(
     -------
     Tuple of NamedTotal instances for a single aggregation.
     """
+    by_column = {}
+    for total in totals:
+        by_column.setdefault(total.column, []).append(total)
+    required = set(required or [])
 
-    def validator(subset) -> bool:
-        """Given subset contains no duplicated cols and all required cols"""
-        columns_in_subset = [c for c, _, _ in subset]
-        is_distinct = len(columns_in_subset) == len(set(columns_in_subset))
-        has_required = True
-        if required is not None:
-            has_required = set(required).issubset(columns_in_subset)
+    for r in range(1, len(by_column) + 1):
+        for columns in combinations(by_column, r):
+            if required.issubset(columns):
+                yield from product(*[by_column[c] for c in columns])
 
-        return is_distinct & has_required
 
-    subsets = []
-    for combin in [combinations(totals, r) for r in range(1, len(totals) + 1)]:
-        for subset in combin:
-            subsets.append(subset)
-    for valid in filter(validator, subsets):
-        yield valid
+def _selector_mask(column: Series, selector: Callable[[Any], bool]) -> ndarray:
+    """Boolean mask of the rows in column with a value satisfying the selector
+
+    The column is factorized so the selector is called once per distinct value rather
+    than once per row, then the result is broadcast back to the rows by their codes.
+    Missing values (None, NA, NaT, ...) are passed to the selector row by row.
+    """
+    codes, uniques = factorize(column)
+    # trailing False is selected by the -1 code of missing values
+    selected = fromiter(
+        chain(map(selector, uniques), [False]), dtype=bool, count=len(uniques) + 1
+    )
+    mask = selected[codes]
+    # missing values are not collapsed into one unique, so pass each one as is
+    if (missing := codes == -1).any():
+        mask[missing] = column[missing].map(selector).to_numpy(dtype=bool)
+    return mask
+
+
+def _alias_values(column: Series, alias: str) -> Union[Categorical, str]:
+    """Values that replace every row of the column with the alias
+
+    A categorical column stays categorical with the alias as its only category, which
+    only needs zeroed codes rather than an object array holding the alias per row.
+    """
+    if isinstance(column.dtype, CategoricalDtype):
+        return Categorical.from_codes(zeros(len(column), dtype=int8), [alias])
+    return alias
 
 
-def _create_subset_frame(df: DataFrame, subset: SubsetType) -> DataFrame:
+def _create_subset_frame(
+    df: DataFrame, subset: SubsetType, masks: Dict[MaskKeyType, ndarray]
+) -> DataFrame:
     """Apply the subset definition to filter and transform the DataFrame
 
     Args
     ----
     df: DataFrame to be filtered and transformed
     subset: Definition of the column filters and alias values
+    masks: Selector mask of each NamedTotal in subset, keyed by (column, selector)
 
     Returns
     -------
     Selected rows from df as defined by the selector functions in subset
 
     """
-    for col, alias, selector in subset:
-        df = df.loc[df[col].map(selector)].assign(**{col: alias})
-    return df
-
+    mask = ones(len(df), dtype=bool)
+    for total in subset:
+        mask &= masks[(total.column, total.selector)]
+    df = df.loc[mask]
+    aliases = {
+        total.column: _alias_values(df[total.column], total.alias) for total in subset
+    }
+    return df.assign(**aliases)
+
+
+def _encode_group_columns(
+    df: DataFrame, groupby: List[str], aggregator: AggregatorType
+) -> DataFrame:
+    """Dictionary-encode low cardinality string groupby columns as categoricals
 
-def _combine_to_csv(filepath: str):
-    """Set .csv filepath for outputting all dataframe aggregations
+    Encoding happens once for the whole combination agg, so each subset groups on the
+    integer category codes instead of re-hashing the string keys. Columns with mostly
+    distinct values are left as is, since their categories would be nearly as large as
+    the column itself. Columns that a NamedAgg aggregates are left as is too, so the
+    aggfunc sees the values of the df rather than an unordered categorical.
+    """
+    measured = set()
+    if isinstance(aggregator, dict):
+        measured = {
+            spec.column if isinstance(spec, NamedAgg) else spec[0]
+            for spec in aggregator.values()
+        }
+    encoded = {}
+    for col in groupby:
+        if col in measured or not is_string_dtype(df[col]):
+            continue
+        codes, uniques = factorize(df[col])
+        if len(uniques) <= len(df) * _MAX_CATEGORY_RATIO:
+            encoded[col] = Categorical.from_codes(codes, uniques)
+    return df.assign(**encoded)
+
+
+def _decode_group_levels(agg: DataFrame, dtypes: Dict[str, Any]) -> DataFrame:
+    """Restore the original dtype of groupby index levels encoded as categoricals
+
+    Encoding is internal to the combination agg, so every aggregation is returned with
+    the groupby dtypes of the df regardless of which columns were encoded.
+    """
+    if not dtypes:
+        return agg
+    index = agg.index
+    if isinstance(index, MultiIndex):
+        levels = [
+            level.astype(dtypes[name]) if name in dtypes else level
+            for name, level in zip(index.names, index.levels)
+        ]
+        agg.index = index.set_levels(levels)
+    elif index.name in dtypes:
+        agg.index = index.astype(dtypes[index.name])
+    return agg
+
+
+def _rollup_aggregator(
+    aggregator: AggregatorType, groupby: List[str], totals: List[NamedTotal]
+) -> Optional[Dict[str, NamedAgg]]:
+    """Named aggregations that compute totals from the fully grouped aggregation.
+
+    Totals can be rolled up from the base groupby result, instead of the rows of the
+    df, when every NamedAgg is decomposable, every total column is a groupby column and
+    no measure is named after or aggregates a groupby column. A measure of a groupby
+    column must see the aliases of the subset, not the values of the base result.
+    The base result must keep groups with missing keys, since selectors may accept rows
+    with a missing value that the alias then replaces.
 
-    The first agg output will add the header and replace any existing file. Subsequent
-    aggs only append data to the file.
+    Returns
+    -------
+    Mapping of measure name to the NamedAgg that re-aggregates that measure, or None
+    when the totals must be aggregated from the df.
+    """
+    if not isinstance(aggregator, dict):
+        return None
+    if not all(total.column in groupby for total in totals):
+        return None
+    if any(alias in groupby for alias in aggregator):
+        return None
+    specs = {
+        alias: spec if isinstance(spec, NamedAgg) else NamedAgg(*spec)
+        for alias, spec in aggregator.items()
+    }
+    if any(spec.column in groupby for spec in specs.values()):
+        return None
+    aggfuncs = {alias: spec.aggfunc for alias, spec in specs.items()}
+    if not all(
+        isinstance(func, str) and func in _ROLLUP_AGGFUNCS for func in aggfuncs.values()
+    ):
+        return None
+    return {
+        alias: NamedAgg(alias, _ROLLUP_AGGFUNCS[func])
+        for alias, func in aggfuncs.items()
+    }
+
+
+def _combine_to_csv(file: TextIO):
+    """Set an open .csv file for outputting all dataframe aggregations
+
+    The first agg output will add the header. Subsequent aggs only append data to the
+    file, which stays open between aggs instead of being reopened for each one.
     """
-    csv_kwargs = {"path_or_buf": filepath, "header": True, "mode": "w"}
+    csv_kwargs = {"path_or_buf": file, "header": True}
 
     def append_df(df: DataFrame) -> None:
         df.to_csv(**csv_kwargs)
-        if csv_kwargs["header"]:
-            csv_kwargs["header"] = False
-            csv_kwargs["mode"] = "a"
+        csv_kwargs["header"] = False
 
     return append_df
 
@@ -334,9 +520,12 @@ def dataframe_combination_agg(
     df: DataFrame,
     groupby: List[str],
     totals: List[NamedTotal],
-    aggregator: Callable[[DataFrame], Series],
+    aggregator: AggregatorType,
     totals_only: List[str],
     csv_output_path: str = None,
+    max_workers: Optional[int] = None,
+    engine: Optional[str] = None,
+    engine_kwargs: Optional[dict] = None,
 ) -> DataFrame:
     """Combine results of the same groupby - agg process on subsets of a df
 
@@ -347,34 +536,113 @@ def dataframe_combination_agg(
     totals: List of NamedTotals which defines the total/subtotals in the combination
     aggs\n
     aggregator: Callable that transforms a single grouped dataframe into a series of
-    measures.\n
+    measures, or a mapping of output column name to NamedAgg. A mapping is passed to
+    .agg as named aggregations, which avoids calling back into Python per group. When
+    all of its aggfuncs are sum, count, size, min or max, and all totals are on groupby
+    columns, the df is aggregated once and every total is rolled up from that result.\n
     totals_only: List of column names that will only include their alias values defined
     in totals in the combination output.\n
     csv_output_path: Optional path to a csv file to output each aggregation instead of
     storing in memory. Useful when there are many combinations being created on a
-    large dataframe as only the df and one aggregation are in memory at any time.\n
+    large dataframe as only the df and one aggregation (max_workers aggregations when
+    threaded) are in memory at any time.\n
+    max_workers: Optional number of threads to aggregate subsets concurrently. pandas
+    releases the GIL in its Cython reductions, so this mostly benefits NamedAgg
+    aggregators. At most max_workers subsets are in flight at once, and aggregations
+    are still combined in subset order.\n
+    engine: Optional engine for a callable aggregator, e.g. 'numba'. The aggregator is
+    then passed to .agg instead of .apply, so it must follow the engine's signature
+    and reduce each column of the group separately, e.g. f(values, index) for numba.
+    Ignored for NamedAgg mappings.\n
+    engine_kwargs: Optional kwargs for the engine, e.g. {'parallel': True}.\n
 
     Returns
     -------
     Original dataframe when output to csv, otherwise the result of applying and
-    combining all aggregations.
+    combining all aggregations. Without any totals or totals_only, the only aggregation
+    is the groupby - agg of the whole df. Groups are not sorted, so rows of each
+    aggregation are in order of first appearance of their group in the df.
     """
+    output = ExitStack()
     if csv_output_path is None:
         fn_combin = _combine_to_memory(aggregations := [])
-        fn_output = lambda: concat(aggregations)
+        fn_output = lambda: (
+            aggregations[0] if len(aggregations) == 1 else concat(aggregations)
+        )
     else:
-        fn_combin = _combine_to_csv(csv_output_path)
+        file = output.enter_context(
+            open(
+                csv_output_path,
+                "w",
+                encoding="utf-8",
+                newline="",
+                buffering=_CSV_BUFFER_SIZE,
+            )
+        )
+        fn_combin = _combine_to_csv(file)
         fn_output = lambda: df
 
-    for subset in _generate_valid_subsets(totals, totals_only):
-        (
-            _create_subset_frame(df, subset)
-            .groupby(groupby)
-            .apply(aggregator)
-            .pipe(fn_combin)
+    if isinstance(aggregator, dict):
+        fn_agg = lambda grouped: grouped.agg(**aggregator)
+    elif engine is not None:
+        fn_agg = lambda grouped: grouped.agg(
+            aggregator, engine=engine, engine_kwargs=engine_kwargs
         )
+    else:
+        fn_agg = lambda grouped: grouped.apply(aggregator)
+
+    with output:
+        keyed = _encode_group_columns(df, groupby, aggregator)
+        dtypes = {c: df[c].dtype for c in groupby if keyed[c].dtype != df[c].dtype}
+        fn_decode = lambda agg: _decode_group_levels(agg, dtypes)
+
+        if not totals and not totals_only:
+            (
+                keyed.groupby(groupby, sort=False, observed=True)
+                .pipe(fn_agg)
+                .pipe(fn_decode)
+                .pipe(fn_combin)
+            )
+            return fn_output()
+
+        if (rollup := _rollup_aggregator(aggregator, groupby, totals)) is not None:
+            keyed = (
+                keyed.groupby(groupby, sort=False, observed=True, dropna=False)
+                .agg(**aggregator)
+                .reset_index()
+            )
+            fn_agg = lambda grouped: grouped.agg(**rollup)
+
+        # rows of the df match keyed unless rolled up, and hold the unencoded values
+        selectable = keyed if rollup is not None else df
+        masks = {}
+        for total in totals:
+            if (key := (total.column, total.selector)) not in masks:
+                masks[key] = _selector_mask(selectable[total.column], total.selector)
+
+        def aggregate_subset(subset: SubsetType) -> DataFrame:
+            return (
+                _create_subset_frame(keyed, subset, masks)
+                .groupby(groupby, sort=False, observed=True)
+                .pipe(fn_agg)
+                .pipe(fn_decode)
+            )
 
-    return fn_output()
+        subsets = _generate_valid_subsets(totals, totals_only)
+        if max_workers is None:
+            for subset in subsets:
+                fn_combin(aggregate_subset(subset))
+        else:
+            with ThreadPoolExecutor(max_workers) as executor:
+                pending = deque()
+                for subset in subsets:
+                    pending.append(executor.submit(aggregate_subset, subset))
+                    if len(pending) == max_workers:
+                        fn_combin(pending.popleft().result())
+                while pending:
+                    fn_combin(pending.popleft().result())
+
+        return fn_output()
 
 
 # endregion
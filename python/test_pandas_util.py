@@ -0,0 +1,277 @@
+"""Tests for pandas_util.py"""
+
+from pandas import NA, CategoricalDtype, DataFrame, NamedAgg, Series, read_csv
+from pandas.testing import assert_frame_equal
+from pytest import raises
+
+from pandas_util import (
+    ColumnEnumerator,
+    ColumnSpecs,
+    NamedTotal,
+    _selector_mask,
+    dataframe_combination_agg,
+    define_aggregator_from_dict,
+)
+
+
+def _select_all(value) -> bool:
+    return True
+
+
+def _sales_frame() -> DataFrame:
+    return DataFrame(
+        {
+            "region": ["a", "a", None, "b", "b", "a"],
+            "prod": ["x", None, "y", "x", "y", "y"],
+            "amt": [1, 2, 3, 4, 5, 6],
+        }
+    )
+
+
+def _combination_agg(df: DataFrame, groupby, totals, aggregator) -> DataFrame:
+    return dataframe_combination_agg(df, groupby, totals, aggregator, None)
+
+
+def test_rollup_matches_row_aggregation_with_missing_keys():
+    df = _sales_frame()
+    totals = [
+        NamedTotal("region", "ALL", _select_all),
+        NamedTotal("prod", "ALL", _select_all),
+    ]
+    rollup = {"s": ("amt", "sum"), "c": ("amt", "count")}
+    by_rows = define_aggregator_from_dict(
+        {"s": lambda g: g["amt"].sum(), "c": lambda g: g["amt"].count()}
+    )
+
+    expected = _combination_agg(df, ["region", "prod"], totals, by_rows)
+    result = _combination_agg(df, ["region", "prod"], totals, rollup)
+
+    assert_frame_equal(result, expected, check_dtype=False)
+    assert result.loc[("ALL", "ALL")].tolist() == [21, 6]
+
+
+def test_rollup_with_measure_named_after_groupby_column():
+    df = DataFrame({"r": ["a", "a", "b"], "amt": [1, 2, 3]})
+    totals = [NamedTotal("r", "ALL", _select_all)]
+
+    expected = _combination_agg(df, ["r"], totals, {"r": ("amt", "mean")})
+    result = _combination_agg(df, ["r"], totals, {"r": ("amt", "sum")})
+
+    assert result.index.equals(expected.index)
+    assert result.loc["ALL", "r"] == 6
+
+
+def test_rollup_matches_row_aggregation_for_subtotals():
+    df = _sales_frame().dropna()
+    totals = [
+        NamedTotal("region", "ALL", _select_all),
+        NamedTotal("region", "A", lambda v: v == "a"),
+        NamedTotal("prod", "ALL", _select_all),
+    ]
+    rollup = {
+        "lo": ("amt", "min"),
+        "hi": ("amt", "max"),
+        "n": ("amt", "size"),
+    }
+    by_rows = define_aggregator_from_dict(
+        {
+            "lo": lambda g: g["amt"].min(),
+            "hi": lambda g: g["amt"].max(),
+            "n": lambda g: len(g),
+        }
+    )
+
+    expected = _combination_agg(df, ["region", "prod"], totals, by_rows)
+    result = _combination_agg(df, ["region", "prod"], totals, rollup)
+
+    assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_groupby_dtypes_do_not_depend_on_encoding():
+    df = _sales_frame().dropna()
+    totals = [NamedTotal("region", "ALL", _select_all)]
+    aggregator = {"s": ("amt", "sum")}
+
+    no_totals = _combination_agg(df, ["region", "prod"], [], aggregator)
+    one_subset = _combination_agg(df, ["region", "prod"], totals, aggregator)
+    encoded = df.astype({"region": "category"})
+    categorical = _combination_agg(encoded, ["region"], totals, aggregator)
+
+    assert no_totals.index.dtypes.tolist() == df[["region", "prod"]].dtypes.tolist()
+    assert one_subset.index.dtypes.tolist() == df[["region", "prod"]].dtypes.tolist()
+    assert isinstance(categorical.index.dtype, CategoricalDtype)
+
+
+def test_no_totals_respects_totals_only():
+    df = _sales_frame().dropna()
+
+    no_totals = _combination_agg(df, ["region"], [], {"s": ("amt", "sum")})
+    assert no_totals["s"].tolist() == [7, 9]
+
+    with raises(ValueError):
+        dataframe_combination_agg(df, ["region"], [], {"s": ("amt", "sum")}, ["region"])
+
+
+def test_enumerator_lists_are_not_shared():
+    cols = ColumnEnumerator([ColumnSpecs("a", "col_a", "Int64")])
+
+    cols.select.append("junk")
+    cols.dtype_mapping["junk"] = "string"
+
+    assert cols.select == ["col_a"]
+    assert cols.dtype_mapping == {"col_a": "Int64"}
+
+
+def test_enumerator_groups_are_per_instance():
+    specs = [ColumnSpecs("a", "col_a", "Int64"), ColumnSpecs("b", "col_b", "string")]
+    first = ColumnEnumerator(specs)
+    second = ColumnEnumerator(specs)
+
+    first.add_group("FIRST", ["col_a"])
+    second.add_group("SECOND", ["col_b"])
+
+    assert vars(first.G).keys() == {"FIRST"}
+    assert vars(second.G).keys() == {"SECOND"}
+    assert first.G.FIRST.select == ["col_a"]
+    assert second.G.SECOND.select == ["col_b"]
+
+
+def test_add_group_rejects_unknown_columns():
+    cols = ColumnEnumerator([ColumnSpecs("a", "col_a", "Int64")])
+
+    with raises(ValueError, match="'col_b' is not a name"):
+        cols.add_group("BAD", ["col_a", "col_b"])
+    with raises(ValueError, match="within this ColumnEnumerator"):
+        cols.add_group("BAD", [ColumnSpecs("a", "col_a", "string")])
+
+
+def test_from_csv_rejects_rows_with_too_many_fields(tmp_path):
+    first_row_too_long = tmp_path / "first.csv"
+    first_row_too_long.write_text("a,col_a,Int64,desc,extra\nb,col_b,string\n")
+    later_row_too_long = tmp_path / "later.csv"
+    later_row_too_long.write_text("a,col_a,Int64\nb,col_b,string,desc,extra\n")
+
+    for filepath in (first_row_too_long, later_row_too_long):
+        with raises(ValueError, match="more than 4 fields"):
+            ColumnEnumerator.from_csv(filepath, ignore_header=False)
+
+
+def test_from_csv_reads_quoted_and_missing_desc(tmp_path):
+    filepath = tmp_path / "specs.csv"
+    filepath.write_text('attr,name,dtype,desc\na,col_a,Int64\nb,col_b,string,"x, y"\n')
+
+    cols = ColumnEnumerator.from_csv(filepath, ignore_header=True)
+
+    assert cols.specs == [
+        ColumnSpecs("a", "col_a", "Int64"),
+        ColumnSpecs("b", "col_b", "string", "x, y"),
+    ]
+
+
+def test_define_aggregator_from_dict():
+    assert callable(define_aggregator_from_dict({}))
+    assert callable(define_aggregator_from_dict({"n": len}))
+
+    named = define_aggregator_from_dict(
+        {"s": ("amt", "sum"), "n": NamedAgg("amt", "size")}
+    )
+
+    assert named == {"s": NamedAgg("amt", "sum"), "n": NamedAgg("amt", "size")}
+
+
+def test_threaded_combination_agg_matches_serial():
+    df = _sales_frame().dropna()
+    totals = [
+        NamedTotal("region", "ALL", _select_all),
+        NamedTotal("region", "A", lambda v: v == "a"),
+        NamedTotal("prod", "ALL", _select_all),
+    ]
+    aggregator = {"s": ("amt", "mean")}
+
+    expected = _combination_agg(df, ["region", "prod"], totals, aggregator)
+    for max_workers in (1, 2, 8):
+        result = dataframe_combination_agg(
+            df, ["region", "prod"], totals, aggregator, None, max_workers=max_workers
+        )
+        assert_frame_equal(result, expected)
+
+
+def test_rollup_matches_row_aggregation_for_groupby_column_measure():
+    df = DataFrame({"yr": [1, 2, 3, 3], "prod": list("xyxy"), "amt": [1, 2, 3, 4]})
+    totals = [NamedTotal("yr", "ALL", _select_all)]
+
+    alone = _combination_agg(df, ["yr", "prod"], totals, {"m": ("yr", "max")})
+    with_row_measure = _combination_agg(
+        df, ["yr", "prod"], totals, {"m": ("yr", "max"), "z": ("amt", "mean")}
+    )
+
+    assert_frame_equal(alone, with_row_measure[["m"]])
+    assert alone.loc[("ALL", "x"), "m"] == "ALL"
+
+
+def test_csv_output_matches_memory_output(tmp_path):
+    df = _sales_frame().dropna()
+    totals = [
+        NamedTotal("region", "ALLÉ", _select_all),
+        NamedTotal("prod", "ALL", _select_all),
+    ]
+    aggregator = {"s": ("amt", "mean")}
+    filepath = tmp_path / "aggs.csv"
+
+    expected = _combination_agg(df, ["region", "prod"], totals, aggregator)
+    result = dataframe_combination_agg(
+        df, ["region", "prod"], totals, aggregator, None, csv_output_path=filepath
+    )
+    lines = filepath.read_bytes().decode("utf-8").splitlines()
+    written = read_csv(filepath, encoding="utf-8", index_col=[0, 1])
+
+    assert result is df
+    assert lines.count("region,prod,s") == 1
+    assert lines[0] == "region,prod,s"
+    assert written.index.tolist() == expected.index.tolist()
+    assert written["s"].tolist() == expected["s"].tolist()
+    assert ("ALLÉ", "ALL") in written.index
+
+
+def test_selectors_see_missing_values_as_is():
+    df = DataFrame({"region": Series(["a", None, "a"], dtype=object), "amt": [1, 2, 3]})
+    totals = [NamedTotal("region", "MISSING", lambda v: v is None)]
+    aggregator = define_aggregator_from_dict({"s": lambda g: g["amt"].sum()})
+
+    result = _combination_agg(df, ["region"], totals, aggregator)
+
+    assert result["s"].to_dict() == {"MISSING": 2}
+
+
+def test_selector_mask_keeps_missing_value_kinds():
+    column = Series(["a", None, NA, "a"], dtype=object)
+
+    assert _selector_mask(column, lambda v: v is None).tolist() == [
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert _selector_mask(column, lambda v: v is NA).tolist() == [
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert _selector_mask(column, lambda v: isinstance(v, str)).tolist() == [
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_measure_of_groupby_column_is_not_encoded():
+    df = _sales_frame()
+    totals = [NamedTotal("region", "ALL", _select_all)]
+    aggregator = {"m": ("prod", "max"), "s": ("amt", "sum")}
+
+    result = _combination_agg(df, ["region", "prod"], totals, aggregator)
+
+    assert result.loc[("ALL", "x"), "m"] == "x"
+    assert result.loc[("ALL", "y"), "s"] == 3 + 5 + 6